@@ -1,11 +1,27 @@
-from flask import Flask, render_template, request, redirect, url_for, session, send_file
+from flask import (
+    Flask,
+    render_template,
+    request,
+    redirect,
+    url_for,
+    session,
+    send_file,
+    jsonify,
+)
 from src.utils.report_generator import generate_report
 import os
-import uuid
 import re
 import sys
+import copy
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from dotenv import load_dotenv
 from flask_session import Session
+from cachelib import FileSystemCache, RedisCache
 
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
@@ -20,13 +36,88 @@ from src.matching.matching_engine import calculate_similarity, get_top_job_match
 from src.analysis.gemini_analysis import (
     enhanced_analysis_with_gemini,
     analyze_with_gemini,
+    DEFAULT as DEFAULT_ANALYSIS,
 )
 from src.utils.priority_skills import get_priority_skills
-from src.utils.keyword_matcher import present_missing_with_surface
+from src.utils.keyword_matcher import present_missing_multi, fold_case, trie_pattern
 from src.analysis.gemini_model_manager import gemini_manager
 
+# Optional robust keyword extraction (resolved once at import)
+try:
+    from test_models import RobustKeywordExtractor, KeywordValidator
+
+    _HAS_ROBUST = True
+except ImportError:
+    _HAS_ROBUST = False
+
 load_dotenv()
 
+# High-priority skills never change at runtime; freeze once for set algebra
+PRIORITY_SKILLS = frozenset(get_priority_skills())
+
+# Gemini round-trips take seconds, so they run off the request thread; the
+# result page renders the deterministic scores first and polls for the rest
+_gemini_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("GEMINI_WORKERS", "4")),
+    thread_name_prefix="gemini",
+)
+# job id -> (submitted_at, future), kept only so abandoned jobs (closed tab,
+# new JD) can be cancelled; bounded and expired on every submit
+GEMINI_JOB_TTL = int(os.getenv("GEMINI_JOB_TTL", "600"))
+GEMINI_JOB_LIMIT = 256
+_gemini_jobs = OrderedDict()
+_gemini_jobs_lock = threading.Lock()
+
+# Stored in the result store while a job runs; replaced by its payload
+_PENDING = "pending"
+
+
+def _safe_analyze(resume_text: str, jd_text: str) -> dict:
+    """_analyze, falling back to the default analysis if it raises."""
+    try:
+        return _analyze(resume_text, jd_text)
+    except Exception as e:
+        print(f"❌ Background analysis failed: {e}")
+        analysis = copy.deepcopy(DEFAULT_ANALYSIS)
+        metrics = compute_metrics(resume_text, jd_text, analysis)
+        return {"analysis": analysis, **metrics}
+
+
+def _run_job(job_id: str, resume_text: str, jd_text: str) -> None:
+    _job_results.set(job_id, _safe_analyze(resume_text, jd_text))
+
+
+def _submit_job(resume_text: str, jd_text: str) -> str:
+    job_id = uuid.uuid4().hex
+    _job_results.set(job_id, _PENDING)
+    future = _gemini_executor.submit(_run_job, job_id, resume_text, jd_text)
+    now = time.monotonic()
+    expired_ids = []
+    with _gemini_jobs_lock:
+        while _gemini_jobs:
+            old_id, (submitted_at, old) = next(iter(_gemini_jobs.items()))
+            expired = now - submitted_at >= GEMINI_JOB_TTL
+            if not expired and len(_gemini_jobs) < GEMINI_JOB_LIMIT:
+                break
+            _gemini_jobs.popitem(last=False)
+            if old.cancel():
+                expired_ids.append(old_id)
+        _gemini_jobs[job_id] = (now, future)
+    # Jobs that never started will not store a result; forget their marker
+    for old_id in expired_ids:
+        _job_results.delete(old_id)
+    return job_id
+
+
+def _drop_job(job_id) -> None:
+    if not job_id:
+        return
+    with _gemini_jobs_lock:
+        entry = _gemini_jobs.pop(job_id, None)
+    if entry:
+        entry[1].cancel()
+    _job_results.delete(job_id)
+
 
 def startup_model_check():
     """Check model availability at startup"""
@@ -44,17 +135,38 @@ def startup_model_check():
 
 app = Flask(__name__)
 app.secret_key = "your_secret_key_here"
-app.config["UPLOAD_FOLDER"] = "uploads"
 app.config["MAX_CONTENT_LENGTH"] = 5 * 1024 * 1024  # 5MB limit
 
 # Flask-Session (server-side session) config
-app.config["SESSION_TYPE"] = "filesystem"
-app.config["SESSION_FILE_DIR"] = os.path.join(app.root_path, "flask_session")
+# SESSION_TYPE=redis (with REDIS_URL) avoids a disk write per request
+app.config["SESSION_TYPE"] = os.getenv("SESSION_TYPE", "filesystem")
 app.config["SESSION_PERMANENT"] = False
 app.config["SESSION_USE_SIGNER"] = True
-os.makedirs(app.config["SESSION_FILE_DIR"], exist_ok=True)
+if app.config["SESSION_TYPE"] == "redis":
+    import redis
+
+    app.config["SESSION_REDIS"] = redis.from_url(
+        os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    )
+else:
+    app.config["SESSION_FILE_DIR"] = os.path.join(app.root_path, "flask_session")
+    os.makedirs(app.config["SESSION_FILE_DIR"], exist_ok=True)
 Session(app)
 
+# Finished analyses go through the session backend's store, keyed by job id,
+# so whichever worker process serves /result can pick up the payload
+if app.config["SESSION_TYPE"] == "redis":
+    _job_results = RedisCache(
+        host=app.config["SESSION_REDIS"],
+        key_prefix="cv-analysis:",
+        default_timeout=GEMINI_JOB_TTL,
+    )
+else:
+    _job_results = FileSystemCache(
+        os.path.join(app.config["SESSION_FILE_DIR"], "analysis"),
+        default_timeout=GEMINI_JOB_TTL,
+    )
+
 gemini_available = startup_model_check()
 
 
@@ -62,18 +174,42 @@ def _escape(text: str) -> str:
     return (text or "").replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
 
 
-def _compile_terms(terms):
-    terms = [t for t in (terms or []) if t]
+def _term_key(terms) -> tuple:
+    """Hashable, order-independent key for a term list (used by the regex cache)."""
+    return tuple(sorted({fold_case(t) for t in (terms or []) if t}))
+
+
+@lru_cache(maxsize=2048)
+def _compile_terms(terms: tuple):
     if not terms:
         return None
-    terms = [re.escape(t) for t in sorted(set(terms), key=len, reverse=True)]
     # Use "not a word char" guards instead of \b so punctuation tokens match:
     # (?<!\w)(term)(?!\w) matches at start or after non-word, and before non-word or end.
-    return re.compile(r"(?i)(?<!\w)(?:" + "|".join(terms) + r")(?!\w)")
+    # Terms are case-folded, so no (?i): run the pattern on fold_case(text).
+    return re.compile(r"(?<!\w)(?:" + trie_pattern(terms) + r")(?!\w)")
+
+
+def _occurs_any(text, phrases):
+    """Return the lowercased phrases that occur (as substrings) in text."""
+    text_lower = fold_case(text)
+    wanted = _term_key((p or "").strip() for p in phrases or [])
+    return {p for p in wanted if p in text_lower}
+
+
+def _coverage_ats_score(pr, mr, po, mo, n_critical, n_improvements, n_low):
+    """Coverage-based ATS score with simple penalties, from counts."""
+    req_coverage = pr / max(1, pr + mr)
+    opt_coverage = po / max(1, po + mo)
+    base = 100 * (0.65 * req_coverage + 0.25 * opt_coverage)
+    penalty = 5 * n_critical + 2 * max(0, n_improvements - 3) + 1 * n_low
+    return int(max(0, min(100, round(base - penalty))))
 
 
 def compute_metrics(resume_text: str, jd_text: str, analysis: dict):
-    """Enhanced metrics with model information"""
+    """
+    Deterministic keyword coverage, counts and ATS score for a resume/JD pair.
+    Updates `analysis` in place and returns the resume terms to highlight.
+    """
 
     # Add model info to analysis
     model_name = gemini_manager.get_working_model_name()
@@ -88,16 +224,14 @@ def compute_metrics(resume_text: str, jd_text: str, analysis: dict):
         }
 
     # Initialize robust processors (if available)
-    try:
-        from test_models import RobustKeywordExtractor, KeywordValidator
-
+    if _HAS_ROBUST:
         extractor = RobustKeywordExtractor()
         validator = KeywordValidator()
         # Extract keywords robustly
         robust_keywords = extractor.extract_keywords(resume_text, jd_text)
         # Validate extracted keywords
         validated_keywords = validator.validate_keywords(robust_keywords, jd_text)
-    except ImportError:
+    else:
         # Fallback if classes not available
         validated_keywords = {
             "jd_required_keywords": analysis.get("jd_required_keywords", []),
@@ -109,92 +243,70 @@ def compute_metrics(resume_text: str, jd_text: str, analysis: dict):
     # Merge with Gemini analysis (keeping AI insights for language improvements)
     analysis.update(validated_keywords)
 
-    # Build role-aware synonyms (now more deterministic)
-    from src.utils.dynamic_synonyms import get_role_synonyms
-
-    role_syns = get_role_synonyms(
-        validated_keywords.get("jd_required_keywords", []),
-        validated_keywords.get("jd_optional_keywords", []),
-        validated_keywords.get("technical_skills", []),
-        validated_keywords.get("soft_skills", []),
-        jd_text,
-    )
-
-    # Present/missing analysis with better matching
-    from src.utils.keyword_matcher import present_missing_with_surface
-
-    pr, mr, surf_req = present_missing_with_surface(
-        resume_text, validated_keywords.get("jd_required_keywords", []), role_syns
-    )
-    po, mo, surf_opt = present_missing_with_surface(
-        resume_text, validated_keywords.get("jd_optional_keywords", []), role_syns
-    )
-    pt, mt, surf_tech = present_missing_with_surface(
-        resume_text, validated_keywords.get("technical_skills", []), role_syns
-    )
-    ps, ms, surf_soft = present_missing_with_surface(
-        resume_text, validated_keywords.get("soft_skills", []), role_syns
+    # Present/missing analysis: one batched pass over the resume text
+    matches = present_missing_multi(
+        resume_text,
+        {
+            "req": validated_keywords.get("jd_required_keywords", []),
+            "opt": validated_keywords.get("jd_optional_keywords", []),
+            "tech": validated_keywords.get("technical_skills", []),
+            "soft": validated_keywords.get("soft_skills", []),
+        },
     )
-
-    found_all = sorted(list(pr | po))
-    missing_all = sorted(list(mr | mo))
-
-    # Deterministic scoring algorithm
-    req_total = max(1, len(pr) + len(mr))
-    opt_total = max(1, len(po) + len(mo))
-    tech_total = max(1, len(pt) + len(mt))
-
-    req_coverage = len(pr) / req_total
-    opt_coverage = len(po) / opt_total
-    tech_coverage = len(pt) / tech_total
-
-    # Weighted base score
-    base_score = 100 * (
-        0.50 * req_coverage  # Required skills are most important
-        + 0.25 * opt_coverage  # Optional skills
-        + 0.20 * tech_coverage  # Technical skills
-        + 0.05 * min(1.0, len(ps) / max(1, len(ps) + len(ms)))  # Soft skills bonus
+    pr, mr, surf_req = matches["req"]
+    po, mo, surf_opt = matches["opt"]
+    pt, mt, surf_tech = matches["tech"]
+    ps, ms, surf_soft = matches["soft"]
+
+    # Deterministic counts based on the sets above
+    found_all = sorted(pr | po)
+    missing_all = sorted(mr | mo)
+
+    # Improvements = weak phrases that actually appear in resume
+    weak_matched = _occurs_any(resume_text, analysis.get("weak_language_phrases"))
+    low_matched = _occurs_any(resume_text, analysis.get("low_context_phrases"))
+
+    # Critical issues: missing REQUIRED keywords that are high-priority in your DB
+    critical_missing = mr & PRIORITY_SKILLS
+
+    # Deterministic ATS score from coverage and simple penalties
+    ats_score = _coverage_ats_score(
+        len(pr),
+        len(mr),
+        len(po),
+        len(mo),
+        len(critical_missing),
+        len(weak_matched),
+        len(low_matched),
     )
 
-    # Calculate penalties
-    critical_penalty = len(mr) * 8  # 8 points per missing required
-    weak_language_penalty = len(analysis.get("weak_language_phrases", [])) * 3
-    low_context_penalty = len(analysis.get("low_context_phrases", [])) * 2
-
-    total_penalty = critical_penalty + weak_language_penalty + low_context_penalty
-    total_penalty = min(total_penalty, base_score * 0.7)  # Cap penalty at 70% of base
-
-    ats_score = max(0, min(100, int(base_score - total_penalty)))
-
-    # Update analysis with robust results
+    # Update analysis so template numbers match exactly
     analysis.update(
         {
-            "present_required": sorted(list(pr)),
-            "missing_required": sorted(list(mr)),
-            "present_optional": sorted(list(po)),
-            "missing_optional": sorted(list(mo)),
-            "present_technical": sorted(list(pt)),
-            "missing_technical": sorted(list(mt)),
-            "present_soft": sorted(list(ps)),
-            "missing_soft": sorted(list(ms)),
+            # canonicals for chips/counts
+            "present_required": sorted(pr),
+            "missing_required": sorted(mr),
+            "present_optional": sorted(po),
+            "missing_optional": sorted(mo),
+            "present_technical": sorted(pt),
+            "missing_technical": sorted(mt),
+            "present_soft": sorted(ps),
+            "missing_soft": sorted(ms),
             "resume_keywords_found": found_all,
             "resume_keywords_missing": missing_all,
+            "critical_missing_required": sorted(critical_missing),
+            "non_critical_missing_required": sorted(mr - PRIORITY_SKILLS),
             "smart_cv_analysis": {
-                "critical_issues": len(mr),
-                "improvements": len(analysis.get("weak_language_phrases", [])),
+                "critical_issues": len(critical_missing),
+                "improvements": len(weak_matched),
                 "missing_skills": len(missing_all),
                 "keywords_found": len(found_all),
             },
             "ats_score": ats_score,
-            "coverage_metrics": {
-                "required_coverage": round(req_coverage * 100, 1),
-                "optional_coverage": round(opt_coverage * 100, 1),
-                "technical_coverage": round(tech_coverage * 100, 1),
-            },
         }
     )
 
-    # Build highlighting terms
+    # Resume highlighting: use actual matched surfaces so users see exactly what matched
     resume_good_terms = (
         list(surf_req.values())
         + list(surf_opt.values())
@@ -206,31 +318,75 @@ def compute_metrics(resume_text: str, jd_text: str, analysis: dict):
 
 
 def _highlight(text, good=None, critical=None, medium=None, low=None):
-    html = _escape(text)
-    repl = []
+    # Match on the raw text and escape only when emitting, so terms never hit
+    # entity text like "&amp;" and terms containing &, < or > still match
+    text = text or ""
+    folded = fold_case(text)  # same offsets as text
+    spans = []
+    taken = bytearray(len(text))
 
     def wrap(regex, cls):
-        nonlocal html
         if not regex:
             return
-
-        def _sub(m):
-            token = m.group(0)
-            ph = f"@@H{len(repl)}@@"
-            repl.append((ph, f'<span class="hl {cls}">{_escape(token)}</span>'))
-            return ph
-
-        html = regex.sub(_sub, html)
+        # Collect (start, end, class) spans; earlier passes win on overlap
+        pos = 0
+        while True:
+            m = regex.search(folded, pos)
+            if not m:
+                break
+            s, e = m.span()
+            t = taken.find(1, s, e)
+            if t == s:
+                # Starts inside a taken span: resume after that span
+                pos = taken.find(0, s)
+                if pos == -1:
+                    break
+                continue
+            if t != -1:
+                # Runs into a taken span: a shorter term may still fit before
+                # it; otherwise retry from the next position
+                m = regex.match(folded, s, t)
+                if not m:
+                    pos = s + 1
+                    continue
+                s, e = m.span()
+            taken[s:e] = b"\x01" * (e - s)
+            spans.append((s, e, cls))
+            pos = e
 
     # Order matters to avoid overwriting
-    wrap(_compile_terms(critical), "hl-critical")
-    wrap(_compile_terms(medium), "hl-medium")
-    wrap(_compile_terms(low), "hl-low")
-    wrap(_compile_terms(good), "hl-good")
-
-    for ph, markup in repl:
-        html = html.replace(ph, markup)
-    return html
+    wrap(_compile_terms(_term_key(critical)), "hl-critical")
+    wrap(_compile_terms(_term_key(medium)), "hl-medium")
+    wrap(_compile_terms(_term_key(low)), "hl-low")
+    wrap(_compile_terms(_term_key(good)), "hl-good")
+
+    # Stitch the output in a single pass over the sorted spans
+    out = []
+    prev = 0
+    for s, e, cls in sorted(spans):
+        out.append(_escape(text[prev:s]))
+        out.append(f'<span class="hl {cls}">{_escape(text[s:e])}</span>')
+        prev = e
+    out.append(_escape(text[prev:]))
+    return "".join(out)
+
+
+def _render_highlights(resume_text, jd_text, analysis, resume_good_terms):
+    """Return (resume_hl, jd_hl) HTML for the result page."""
+    # JD highlighting (green present, red required miss, blue optional miss)
+    jd_hl = _highlight(
+        jd_text,
+        good=analysis.get("resume_keywords_found", []),
+        critical=analysis.get("missing_required", []),
+        low=analysis.get("missing_optional", []),
+    )
+    resume_hl = _highlight(
+        resume_text,
+        good=resume_good_terms,
+        medium=[p.lower() for p in analysis.get("weak_language_phrases", [])],
+        low=[p.lower() for p in analysis.get("low_context_phrases", [])],
+    )
+    return resume_hl, jd_hl
 
 
 def _ats_level(score: int) -> str:
@@ -245,6 +401,7 @@ def _ats_level(score: int) -> str:
 
 @app.route("/", methods=["GET"])
 def index():
+    _drop_job(session.get("analysis_job"))
     session.clear()
     return render_template("index.html")
 
@@ -255,12 +412,8 @@ def process_resume_route():
     if "resume_file" in request.files:
         resume_file = request.files["resume_file"]
         if resume_file.filename != "":
-            file_ext = os.path.splitext(resume_file.filename)[1]
-            filename = f"resume_{uuid.uuid4().hex}{file_ext}"
-            file_path = os.path.join(app.config["UPLOAD_FOLDER"], filename)
-            resume_file.save(file_path)
-            resume_text = process_resume(file_path)
-            os.remove(file_path)
+            # Parse straight from the upload stream; no temp file round-trip
+            resume_text = process_resume(resume_file.stream, resume_file.filename)
     if not resume_text and "resume_text" in request.form:
         resume_text = request.form["resume_text"]
     if resume_text:
@@ -282,12 +435,7 @@ def process_jd_route():
     if "jd_file" in request.files:
         jd_file = request.files["jd_file"]
         if jd_file.filename != "":
-            file_ext = os.path.splitext(jd_file.filename)[1]
-            filename = f"jd_{uuid.uuid4().hex}{file_ext}"
-            file_path = os.path.join(app.config["UPLOAD_FOLDER"], filename)
-            jd_file.save(file_path)
-            jd_text = process_jd(file_path)
-            os.remove(file_path)
+            jd_text = process_jd(jd_file.stream, jd_file.filename)
     if not jd_text and "jd_text" in request.form:
         jd_text = request.form["jd_text"]
 
@@ -301,133 +449,63 @@ def process_jd_route():
         similarity_score = calculate_similarity(resume_clean, jd_clean)
         top_matches = get_top_job_matches(resume_clean)
 
-        # Gemini ATS analysis uses original text (better extraction)
-        analysis = analyze_with_gemini(session["resume_text"], jd_text)
-
-        # Compute present/missing by matching directly against the resume text
-        req_terms = analysis.get("jd_required_keywords", [])
-        opt_terms = analysis.get("jd_optional_keywords", [])
-        tech_terms = analysis.get("technical_skills", [])
-        soft_terms = analysis.get("soft_skills", [])
+        # Gemini ATS analysis uses original text (better extraction) and is
+        # finished in the background; /result picks it up when it is done
+        _drop_job(session.get("analysis_job"))
+        job_id = _submit_job(session["resume_text"], jd_text)
 
-        pr, mr, surf_req = present_missing_with_surface(
-            session["resume_text"], req_terms
-        )
-        po, mo, surf_opt = present_missing_with_surface(
-            session["resume_text"], opt_terms
-        )
-        pt, mt, surf_tech = present_missing_with_surface(
-            session["resume_text"], tech_terms
-        )
-        ps, ms, surf_soft = present_missing_with_surface(
-            session["resume_text"], soft_terms
-        )
-
-        # JD highlighting (green present, red required miss, blue optional miss)
-        jd_hl = _highlight(
-            jd_text,
-            good=sorted(list(pr | po)),
-            critical=sorted(list(mr)),
-            low=sorted(list(mo)),
-        )
+        # Save results
+        session["similarity_score"] = similarity_score
+        session["top_matches"] = top_matches
+        session["analysis_job"] = job_id
+        for key in ("analysis", "resume_good_terms", "ats_level"):
+            session.pop(key, None)
 
-        # Resume highlighting: use actual matched surfaces so users see exactly what matched
-        resume_good_terms = (
-            list(surf_req.values())
-            + list(surf_opt.values())
-            + list(surf_tech.values())
-            + list(surf_soft.values())
-        )
-        resume_hl = _highlight(
-            session["resume_text"],
-            good=resume_good_terms,
-            medium=[p.lower() for p in analysis.get("weak_language_phrases", [])],
-            low=[p.lower() for p in analysis.get("low_context_phrases", [])],
-        )
+        return redirect(url_for("result"))
 
-        # Deterministic counts based on the sets above
-        keywords_found_all = sorted(list(pr | po))
-        missing_skills_all = sorted(list(mr | mo))
+    return redirect(url_for("upload_jd"))
 
-        # Improvements = weak phrases that actually appear in resume
-        def occurs_any(text, phrases):
-            matched = set()
-            for p in phrases or []:
-                p2 = (p or "").strip()
-                if not p2:
-                    continue
-                if re.search(
-                    re.escape(p2), session["resume_text"], flags=re.IGNORECASE
-                ):
-                    matched.add(p2.lower())
-            return matched
-
-        weak_matched = occurs_any(
-            session["resume_text"], analysis.get("weak_language_phrases")
-        )
-        low_matched = occurs_any(
-            session["resume_text"], analysis.get("low_context_phrases")
-        )
 
-        improvements_count = len(weak_matched)
-        missing_skills_count = len(missing_skills_all)
-        keywords_found_count = len(keywords_found_all)
-
-        # Critical issues: missing REQUIRED keywords that are high-priority in your DB
-        PRIORITY = get_priority_skills()
-        critical_missing = [k for k in mr if k in PRIORITY]
-        critical_count = len(critical_missing)
-
-        # Deterministic ATS score from coverage and simple penalties
-        req_total = max(1, len(pr) + len(mr))
-        opt_total = max(1, len(po) + len(mo))
-        req_coverage = len(pr) / req_total
-        opt_coverage = len(po) / opt_total
-        base = 100 * (0.65 * req_coverage + 0.25 * opt_coverage)
-        penalty = (
-            5 * critical_count
-            + 2 * max(0, improvements_count - 3)
-            + 1 * len(low_matched)
-        )
-        ats_score = int(max(0, min(100, round(base - penalty))))
-
-        # Update analysis so template numbers match exactly
-        analysis.update(
-            {
-                # canonicals for chips/counts
-                "present_required": sorted(list(pr)),
-                "missing_required": sorted(list(mr)),
-                "present_optional": sorted(list(po)),
-                "missing_optional": sorted(list(mo)),
-                "present_technical": sorted(list(pt)),
-                "missing_technical": sorted(list(mt)),
-                "present_soft": sorted(list(ps)),
-                "missing_soft": sorted(list(ms)),
-                "resume_keywords_found": keywords_found_all,
-                "resume_keywords_missing": missing_skills_all,
-                "critical_missing_required": sorted(list(set(mr) & PRIORITY)),
-                "non_critical_missing_required": sorted(list(set(mr) - PRIORITY)),
-                "smart_cv_analysis": {
-                    "critical_issues": critical_count,
-                    "improvements": improvements_count,
-                    "missing_skills": missing_skills_count,
-                    "keywords_found": keywords_found_count,
-                },
-                "ats_score": ats_score,
-            }
+def _analyze(resume_text: str, jd_text: str) -> dict:
+    """Gemini analysis plus derived metrics; runs on the worker pool."""
+    analysis = analyze_with_gemini(resume_text, jd_text)
+    metrics = compute_metrics(resume_text, jd_text, analysis)
+    return {"analysis": analysis, **metrics}
+
+
+def _collect_analysis() -> bool:
+    """Move a finished background analysis into the session.
+
+    Returns True once ``session["analysis"]`` is available. A job whose
+    result is gone from the store (expired, or cancelled before it ran) is
+    recomputed inline.
+    """
+    if "analysis" in session:
+        return True
+    job_id = session.get("analysis_job")
+    done = _job_results.get(job_id) if job_id else None
+    if done == _PENDING:
+        return False
+    if done is None:
+        done = _safe_analyze(
+            session.get("resume_text", ""), session.get("jd_text", "")
         )
+    _drop_job(job_id)
 
-        # Save results
-        session["similarity_score"] = similarity_score
-        session["top_matches"] = top_matches
-        session["analysis"] = analysis
-        session["resume_hl"] = resume_hl
-        session["jd_hl"] = jd_hl
-        session["ats_level"] = _ats_level(analysis.get("ats_score", 0))
+    session["analysis"] = done["analysis"]
+    session["resume_good_terms"] = done["resume_good_terms"]
+    session["ats_level"] = _ats_level(done["analysis"].get("ats_score", 0))
+    session.pop("analysis_job", None)
+    return True
 
-        return redirect(url_for("result"))
 
-    return redirect(url_for("upload_jd"))
+@app.route("/analysis_status", methods=["GET"])
+def analysis_status():
+    if "similarity_score" not in session:
+        return jsonify({"ready": False}), 404
+    job_id = session.get("analysis_job")
+    pending = bool(job_id) and _job_results.get(job_id) == _PENDING
+    return jsonify({"ready": not pending})
 
 
 @app.route("/result", methods=["GET"])
@@ -435,19 +513,33 @@ def result():
     if "similarity_score" not in session:
         return redirect(url_for("index"))
 
+    # Deterministic scores render immediately; the Gemini section shows a
+    # placeholder until the background job has finished
+    pending = not _collect_analysis()
+    analysis = session.get("analysis", {"smart_cv_analysis": {}})
+
+    # Highlights are re-rendered from the stored terms (cached regexes) rather
+    # than kept as large HTML blobs in the session
+    resume_hl, jd_hl = _render_highlights(
+        session.get("resume_text", ""),
+        session.get("jd_text", ""),
+        analysis,
+        session.get("resume_good_terms", []),
+    )
+
     return render_template(
         "result.html",
         similarity_score=session["similarity_score"],
         top_matches=session["top_matches"],
         resume_text=session.get("resume_text", ""),
         jd_text=session.get("jd_text", ""),
-        resume_hl=session.get("resume_hl", ""),
-        jd_hl=session.get("jd_hl", ""),
-        analysis=session.get("analysis", {}),
-        ats_level=session.get("ats_level", "ats-poor"),
+        resume_hl=resume_hl,
+        jd_hl=jd_hl,
+        analysis=analysis,
+        ats_level=None if pending else session.get("ats_level", "ats-poor"),
+        analysis_pending=pending,
     )
 
 
 if __name__ == "__main__":
-    os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
     app.run(debug=True)
@@ -1,9 +1,21 @@
 import os
 import json
 import re
-from typing import Dict, Any, List
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
 from .gemini_model_manager import gemini_manager
 
+# orjson is optional; it parses large responses several times faster
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 DEFAULT = {
     "ats_score": 0,
     "smart_cv_analysis": {
@@ -23,22 +35,160 @@ DEFAULT = {
     "ats_suggestions": [],
 }
 
+# Content-addressed cache of analyses: sha256(resume, jd, model) -> result
+ANALYSIS_CACHE_SIZE = 512
+_analysis_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_analysis_cache_lock = threading.Lock()
 
-def _pull_json(text: str) -> Dict[str, Any]:
+
+def _analysis_key(resume_text: str, jd_text: str, model_name: str) -> str:
+    payload = "\0".join((resume_text or "", jd_text or "", model_name or ""))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _cache_get(key: str):
+    with _analysis_cache_lock:
+        hit = _analysis_cache.get(key)
+        if hit is None:
+            return None
+        _analysis_cache.move_to_end(key)
+    # Callers mutate the analysis dict, so never hand out the cached object
+    return copy.deepcopy(hit)
+
+
+def _cache_put(key: str, value: Dict[str, Any]) -> None:
+    with _analysis_cache_lock:
+        _analysis_cache[key] = copy.deepcopy(value)
+        _analysis_cache.move_to_end(key)
+        while len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+            _analysis_cache.popitem(last=False)
+
+
+_JSON_TOKENS = re.compile(r'[{}"\\]')
+
+
+def _first_json_object(text: str) -> Optional[str]:
+    """Return the first brace-balanced {...} span in text, or None.
+
+    Linear scan that only visits braces, quotes and backslashes, so braces
+    inside JSON strings (and escaped quotes) don't break the balance.
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+    depth = 0
+    in_str = False
+    skip = -1
+    for m in _JSON_TOKENS.finditer(text, start):
+        pos = m.start()
+        if pos < skip:  # character escaped by a preceding backslash
+            continue
+        ch = m.group()
+        if in_str:
+            if ch == "\\":
+                skip = pos + 2
+            elif ch == '"':
+                in_str = False
+        elif ch == '"':
+            in_str = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start : pos + 1]
+    return None
+
+
+def extract_json(text: str) -> Optional[Dict[str, Any]]:
+    """Parse the JSON object in a model reply; None if there is none."""
     try:
-        return json.loads(text)
+        data = _json_loads(text or "")
     except Exception:
-        m = re.search(r"\{[\s\S]*\}", text or "")
-        if m:
+        data = None
+        candidate = _first_json_object(text or "")
+        if candidate:
             try:
-                return json.loads(m.group(0))
+                data = _json_loads(candidate)
             except Exception:
                 pass
-    return DEFAULT.copy()
+    return data if isinstance(data, dict) else None
+
+
+def _pull_json(text: str) -> Dict[str, Any]:
+    data = extract_json(text)
+    return DEFAULT.copy() if data is None else data
+
+
+# JSON keys shared by the ATS and enhanced prompts
+ATS_KEYS_SPEC = """- jd_required_keywords: array of lowercase must-have keywords/technologies from JD
+- jd_optional_keywords: array of lowercase nice-to-have keywords from JD
+- resume_keywords_found: array of lowercase JD keywords found in the resume
+- resume_keywords_missing: array of lowercase required JD keywords not found in the resume
+- weak_language_phrases: array of vague resume phrases to tighten (original casing if possible)
+- low_context_phrases: array of resume phrases that need quantification/context (original casing)
+- technical_skills: array of lowercase technical skills stack for the role (from JD)
+- soft_skills: array of lowercase soft skills for the role (from JD)
+- smart_cv_analysis: object with integer fields:
+   critical_issues, improvements, missing_skills, keywords_found
+- ats_score: integer 0-100 summarizing ATS compatibility
+- ats_suggestions: array of short actionable suggestions (<= 8 words each)"""
+
+ENHANCED_KEYS = (
+    "overall_summary",
+    "experience_analysis",
+    "skill_analysis",
+    "education_analysis",
+    "suitability_score",
+    "report_summary",
+)
+
+
+def _normalize_analysis(data: Dict[str, Any], model_name: str) -> Dict[str, Any]:
+    """Fill defaults and normalize the ATS keys of a raw Gemini response."""
+    out = DEFAULT.copy()
+    out.update({k: data.get(k, out[k]) for k in out.keys()})
+
+    # Add model info to response
+    out["model_used"] = model_name
+    out["model_available"] = True
+
+    # Normalize data...
+    sca = out.get("smart_cv_analysis") or {}
+    out["smart_cv_analysis"] = {
+        "critical_issues": int(sca.get("critical_issues", 0)),
+        "improvements": int(sca.get("improvements", 0)),
+        "missing_skills": int(
+            sca.get("missing_skills", len(out.get("resume_keywords_missing", [])))
+        ),
+        "keywords_found": int(
+            sca.get("keywords_found", len(out.get("resume_keywords_found", [])))
+        ),
+    }
+    out["ats_score"] = int(out.get("ats_score", 0))
+
+    # Normalize keyword lists
+    for key in [
+        "jd_required_keywords",
+        "jd_optional_keywords",
+        "resume_keywords_found",
+        "resume_keywords_missing",
+        "technical_skills",
+        "soft_skills",
+    ]:
+        arr = out.get(key) or []
+        out[key] = sorted({str(x).strip().lower() for x in arr if str(x).strip()})
+
+    # Keep phrase casing, remove duplicates
+    for key in ["weak_language_phrases", "low_context_phrases", "ats_suggestions"]:
+        arr = out.get(key) or []
+        out[key] = list(dict.fromkeys(str(x).strip() for x in arr if str(x).strip()))
+
+    return out
 
 
 def enhanced_analysis_with_gemini(resume_text: str, jd_text: str) -> Dict[str, Any]:
-    """Enhanced analysis with a more sophisticated prompt."""
+    """Enhanced analysis with a more sophisticated prompt (single Gemini call)."""
     model = gemini_manager.get_model()
     if not model:
         return DEFAULT.copy()
@@ -57,6 +207,9 @@ Analyze the provided RESUME and JOB DESCRIPTION and return a single JSON object
 - "suitability_score": An integer score from 0 to 100 indicating the overall match between the resume and the job description.
 - "report_summary": A bulleted list of the candidate's strengths and weaknesses for the role.
 
+The same JSON object must also include these ATS keys:
+{ATS_KEYS_SPEC}
+
 RESUME:
 {resume_text}
 
@@ -66,15 +219,15 @@ JOB_DESCRIPTION:
 
     try:
         resp = model.generate_content(prompt)
-        enhanced_data = _pull_json(resp.text or "")
+        data = _pull_json(resp.text or "")
         print(f"✅ Enhanced analysis completed with {model_name}")
     except Exception as e:
         print(f"❌ Enhanced analysis failed with {model_name}: {str(e)}")
-        enhanced_data = {}
+        data = DEFAULT.copy()
 
-    # Combine with the original analysis
-    analysis = analyze_with_gemini(resume_text, jd_text)
-    analysis.update(enhanced_data)
+    # One response carries both the ATS keys and the enhanced sections
+    analysis = _normalize_analysis(data, model_name)
+    analysis.update({k: data[k] for k in ENHANCED_KEYS if k in data})
 
     return analysis
 
@@ -90,24 +243,20 @@ def analyze_with_gemini(resume_text: str, jd_text: str) -> Dict[str, Any]:
         return DEFAULT.copy()
 
     model_name = gemini_manager.get_working_model_name()
+
+    cache_key = _analysis_key(resume_text, jd_text, model_name)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        print(f"♻️ Reusing cached analysis from {model_name}")
+        return cached
+
     print(f"🤖 Using Gemini model: {model_name}")
 
     prompt = f"""
 Act as an expert ATS optimizer.
 
 Return ONLY a single JSON object with keys:
-- jd_required_keywords: array of lowercase must-have keywords/technologies from JD
-- jd_optional_keywords: array of lowercase nice-to-have keywords from JD
-- resume_keywords_found: array of lowercase JD keywords found in the resume
-- resume_keywords_missing: array of lowercase required JD keywords not found in the resume
-- weak_language_phrases: array of vague resume phrases to tighten (original casing if possible)
-- low_context_phrases: array of resume phrases that need quantification/context (original casing)
-- technical_skills: array of lowercase technical skills stack for the role (from JD)
-- soft_skills: array of lowercase soft skills for the role (from JD)
-- smart_cv_analysis: object with integer fields:
-   critical_issues, improvements, missing_skills, keywords_found
-- ats_score: integer 0-100 summarizing ATS compatibility
-- ats_suggestions: array of short actionable suggestions (<= 8 words each)
+{ATS_KEYS_SPEC}
 
 RESUME:
 {resume_text}
@@ -116,51 +265,24 @@ JOB_DESCRIPTION:
 {jd_text}
 """
 
+    succeeded = False
     try:
         resp = model.generate_content(prompt)
-        data = _pull_json(resp.text or "")
-        print(f"✅ Analysis completed with {model_name}")
+        data = extract_json(resp.text or "")
+        succeeded = data is not None
+        if succeeded:
+            print(f"✅ Analysis completed with {model_name}")
+        else:
+            print(f"❌ Analysis from {model_name} was not valid JSON")
+            data = DEFAULT.copy()
     except Exception as e:
         print(f"❌ Analysis failed with {model_name}: {str(e)}")
         data = DEFAULT.copy()
 
-    # Normalize and fill defaults
-    out = DEFAULT.copy()
-    out.update({k: data.get(k, out[k]) for k in out.keys()})
-
-    # Add model info to response
-    out["model_used"] = model_name
-    out["model_available"] = True
-
-    # Normalize data...
-    sca = out.get("smart_cv_analysis") or {}
-    out["smart_cv_analysis"] = {
-        "critical_issues": int(sca.get("critical_issues", 0)),
-        "improvements": int(sca.get("improvements", 0)),
-        "missing_skills": int(
-            sca.get("missing_skills", len(out.get("resume_keywords_missing", [])))
-        ),
-        "keywords_found": int(
-            sca.get("keywords_found", len(out.get("resume_keywords_found", [])))
-        ),
-    }
-    out["ats_score"] = int(out.get("ats_score", 0))
-
-    # Normalize keyword lists
-    for key in [
-        "jd_required_keywords",
-        "jd_optional_keywords",
-        "resume_keywords_found",
-        "resume_keywords_missing",
-        "technical_skills",
-        "soft_skills",
-    ]:
-        arr = out.get(key) or []
-        out[key] = sorted(list({str(x).strip().lower() for x in arr if str(x).strip()}))
+    out = _normalize_analysis(data, model_name)
 
-    # Keep phrase casing, remove duplicates
-    for key in ["weak_language_phrases", "low_context_phrases", "ats_suggestions"]:
-        arr = out.get(key) or []
-        out[key] = list(dict.fromkeys([str(x).strip() for x in arr if str(x).strip()]))
+    # Only parsed responses are cached so transient failures get retried
+    if succeeded:
+        _cache_put(cache_key, out)
 
     return out
@@ -1,6 +1,6 @@
 import os
 import google.generativeai as genai
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -52,6 +52,49 @@ class GeminiModelManager:
         if self._model_instance and self._working_model:
             return self._model_instance
         
+        model_name, verified = self._resolve_model_name()
+        if not model_name:
+            logger.error("❌ No working Gemini model found")
+            return None
+        
+        try:
+            # No test generation here: the model is only checked against
+            # list_models(), so picking it does not cost a billed request
+            model = genai.GenerativeModel(
+                model_name,
+                generation_config=generation_config
+            )
+        except Exception as e:
+            logger.error(f"❌ {model_name} failed: {str(e)[:100]}")
+            return None
+        
+        logger.info(f"✅ Using Gemini model: {model_name}")
+        self._working_model = model_name
+        
+        # Unverified picks are not kept, so discovery runs again next call
+        if not verified:
+            return model
+        
+        self._model_instance = model
+        
+        # Save working model to env so other workers skip discovery
+        os.environ["GEMINI_WORKING_MODEL"] = model_name
+        
+        return model
+    
+    def _resolve_model_name(self) -> Tuple[Optional[str], bool]:
+        """
+        Pick the first preferred model that the API key can use. Returns
+        (name, verified); verified is False when list_models() could not
+        confirm the name.
+        """
+        if not self.api_key:
+            return None, False
+        
+        cached = os.getenv("GEMINI_WORKING_MODEL")
+        if cached:
+            return cached, True
+        
         # If user specified a specific model, try that first
         models_to_try = []
         
@@ -61,38 +104,16 @@ class GeminiModelManager:
         else:
             models_to_try = self.available_models
         
-        # Try each model until one works
+        # list_models() returns names like "models/gemini-2.5-flash"
+        listed = {name.split("/")[-1] for name in self.list_available_models()}
+        if not listed:
+            # Listing failed (e.g. network); let the first call surface errors
+            return models_to_try[0], False
+        
         for model_name in models_to_try:
-            try:
-                logger.info(f"Trying Gemini model: {model_name}")
-                
-                model = genai.GenerativeModel(
-                    model_name,
-                    generation_config=generation_config
-                )
-                
-                # Test the model with a simple request
-                test_response = model.generate_content(
-                    "Respond with exactly: MODEL_TEST_OK",
-                    generation_config={"temperature": 0}
-                )
-                
-                if "MODEL_TEST_OK" in test_response.text:
-                    logger.info(f"✅ Successfully connected to: {model_name}")
-                    self._working_model = model_name
-                    self._model_instance = model
-                    
-                    # Save working model to env for future use
-                    os.environ["GEMINI_WORKING_MODEL"] = model_name
-                    
-                    return model
-                
-            except Exception as e:
-                logger.debug(f"❌ {model_name} failed: {str(e)[:100]}")
-                continue
-        
-        logger.error("❌ No working Gemini model found")
-        return None
+            if model_name.split("/")[-1] in listed:
+                return model_name, True
+        return None, False
     
     def get_working_model_name(self) -> Optional[str]:
         """Get the name of the currently working model"""
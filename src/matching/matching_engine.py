@@ -1,14 +1,35 @@
 from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
+import torch
 import joblib
 import os
 import logging
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Optional SIMD distance kernels; NumPy mat-vec is the fallback
+try:
+    import simsimd
+
+    _HAS_SIMSIMD = True
+except ImportError:
+    _HAS_SIMSIMD = False
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# On CUDA hosts query embeddings stay on the GPU as tensors and are scored
+# there; otherwise everything is NumPy on the CPU
+DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+_ON_GPU = DEVICE == "cuda"
+_ENCODE_OUTPUT = (
+    {"convert_to_tensor": True, "device": DEVICE}
+    if _ON_GPU
+    else {"convert_to_numpy": True}
+)
+
 # Predefined job taxonomy
 JOB_TAXONOMY = [
     "System Administrator",
@@ -27,11 +48,41 @@ JOB_TAXONOMY = [
 MODEL_NAME = "bwbayu/sbert_model_jobcv"
 EMBEDDINGS_PATH = "data/models/job_embeddings.pkl"
 
+
+def _load_model():
+    # ONNX Runtime is opt-in: needs sentence-transformers>=3.2 with the onnx extra
+    if os.getenv("SBERT_BACKEND", "").lower() == "onnx":
+        try:
+            return SentenceTransformer(MODEL_NAME, backend="onnx")
+        except Exception as e:
+            logger.warning(f"ONNX backend unavailable, using PyTorch: {e}")
+    return SentenceTransformer(MODEL_NAME)
+
+
 # Initialize model
-model = SentenceTransformer(MODEL_NAME)
+model = _load_model()
 EMBEDDING_DIM = model.get_sentence_embedding_dimension()
 
-# Load or create job embeddings
+
+def _l2_normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _encode_taxonomy():
+    # encode() sorts inputs by length before batching, so padding is minimal
+    embeddings = model.encode(
+        JOB_TAXONOMY,
+        batch_size=64,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+    )
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+# Load or create job embeddings (stored L2-normalized, float16)
 job_embeddings = np.array([])
 try:
     if os.path.exists(EMBEDDINGS_PATH):
@@ -43,44 +94,121 @@ try:
     # Regenerate if empty or dimension mismatch
     if job_embeddings.size == 0:
         logger.info("Generating job embeddings...")
-        embeddings = model.encode(JOB_TAXONOMY)
-        job_embeddings = np.array(embeddings)
+        job_embeddings = _encode_taxonomy()
+        # Stored as float16 to halve the file size and load bandwidth
         joblib.dump(
-            {"embeddings": job_embeddings, "dimension": EMBEDDING_DIM}, EMBEDDINGS_PATH
+            {
+                "embeddings": job_embeddings.astype(np.float16),
+                "dimension": EMBEDDING_DIM,
+            },
+            EMBEDDINGS_PATH,
         )
         logger.info(f"Saved job embeddings with shape: {job_embeddings.shape}")
 
 except Exception as e:
     logger.error(f"Error loading/generating job embeddings: {e}")
     # Fallback to generating on the fly
-    job_embeddings = model.encode(JOB_TAXONOMY)
+    job_embeddings = _encode_taxonomy()
+
+# Re-normalizing is a no-op for freshly built files and keeps older
+# unnormalized pickles valid; cosine similarity is then a plain mat-vec
+job_embeddings = _l2_normalize(np.asarray(job_embeddings, dtype=np.float32))
+# Keep a device copy for GPU scoring; otherwise SimSIMD has native float16
+# kernels and the NumPy/BLAS path stays on float32
+if _ON_GPU:
+    _job_embeddings_t = torch.as_tensor(job_embeddings, device=DEVICE)
+elif _HAS_SIMSIMD:
+    job_embeddings = job_embeddings.astype(np.float16)
+
+
+# Encoded documents keyed by a content hash; the same resume is typically
+# encoded by calculate_similarity and get_top_job_matches back to back
+EMBEDDING_CACHE_SIZE = 256
+_embedding_cache = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+
+
+def _text_key(text):
+    return hashlib.blake2b((text or "").encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _encode(texts):
+    """Unit-length embeddings for texts; cache misses are encoded in one batch."""
+    keys = [_text_key(t) for t in texts]
+    found = {}
+    with _embedding_cache_lock:
+        for key in keys:
+            hit = _embedding_cache.get(key)
+            if hit is not None:
+                _embedding_cache.move_to_end(key)
+                found[key] = hit
+
+    misses = {key: text for key, text in zip(keys, texts) if key not in found}
+    if misses:
+        vectors = model.encode(
+            list(misses.values()),
+            batch_size=len(misses),
+            normalize_embeddings=True,
+            **_ENCODE_OUTPUT,
+        )
+        with _embedding_cache_lock:
+            for key, vector in zip(misses, vectors):
+                # Shared between callers, so keep it immutable
+                if not _ON_GPU:
+                    vector.setflags(write=False)
+                _embedding_cache[key] = found[key] = vector
+                _embedding_cache.move_to_end(key)
+            while len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+                _embedding_cache.popitem(last=False)
+
+    return [found[key] for key in keys]
 
 
 def calculate_similarity(resume_text, jd_text):
     try:
-        # Generate embeddings
-        resume_embedding = model.encode([resume_text])[0]
-        jd_embedding = model.encode([jd_text])[0]
+        # Encode both documents in one batched forward pass (unit length)
+        resume_embedding, jd_embedding = _encode([resume_text, jd_text])
 
-        # Calculate cosine similarity
-        similarity = cosine_similarity([resume_embedding], [jd_embedding])[0][0]
+        # Cosine similarity of normalized vectors is their dot product
+        similarity = float(resume_embedding @ jd_embedding)
         return round(similarity * 100, 2)
     except Exception as e:
         logger.error(f"Similarity calculation error: {e}")
         return 0.0
 
 
+def _taxonomy_similarities(query):
+    """Cosine similarity of a unit-length query against every job row."""
+    if _ON_GPU:
+        return (_job_embeddings_t @ query).cpu().numpy()
+    if _HAS_SIMSIMD:
+        distances = simsimd.cdist(
+            query[None, :].astype(job_embeddings.dtype, copy=False),
+            job_embeddings,
+            metric="cosine",
+        )
+        return 1.0 - np.asarray(distances, dtype=np.float32)[0]
+    return job_embeddings @ query
+
+
 def get_top_job_matches(resume_text, top_n=5):
     try:
-        # Generate resume embedding
-        resume_embedding = model.encode([resume_text])[0]
+        # Resume embedding (unit length), usually cached by calculate_similarity
+        resume_embedding = _encode([resume_text])[0]
 
-        # Calculate similarity with all jobs
-        similarities = cosine_similarity([resume_embedding], job_embeddings)[0]
+        # Calculate similarity with all jobs (SIMD kernel or BLAS mat-vec)
+        similarities = _taxonomy_similarities(resume_embedding)
 
-        # Get top matches
-        top_indices = np.argsort(similarities)[-top_n:][::-1]
-        return [(JOB_TAXONOMY[i], round(similarities[i] * 100, 2)) for i in top_indices]
+        # Select the top_n without sorting the whole array, then order them
+        top_n = min(top_n, similarities.shape[0])
+        if top_n <= 0:
+            return []
+        top_indices = np.argpartition(similarities, -top_n)[-top_n:]
+        top_indices = top_indices[np.argsort(similarities[top_indices])[::-1]]
+        return [
+            (JOB_TAXONOMY[i], round(float(similarities[i]) * 100, 2))
+            for i in top_indices
+        ]
 
     except Exception as e:
         logger.error(f"Top job matches error: {e}")
@@ -1,32 +1,79 @@
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from PyPDF2 import PdfReader
 from docx import Document
 
+# pypdfium2 is optional; PDFium parses pages much faster than PyPDF2
+try:
+    import pypdfium2 as pdfium
+
+    _HAS_PDFIUM = True
+except ImportError:
+    _HAS_PDFIUM = False
+
+# URLs, punctuation and digits are all dropped for the model copy; one
+# alternation removes them in a single pass over the text
+_MODEL_NOISE = re.compile(r"http\S+|www\S+|[^\w\s]|\d+")
+_WHITESPACE = re.compile(r"\s+")
+_SPACES_TABS = re.compile(r"[ \t]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def _pdf_page_texts(pdf_path):
+    if not _HAS_PDFIUM:
+        for page in PdfReader(pdf_path).pages:
+            yield page.extract_text()
+        return
+    # Streams (e.g. uploads) are handed to PDFium as bytes
+    source = pdf_path if isinstance(pdf_path, str) else pdf_path.read()
+    pdf = pdfium.PdfDocument(source)
+    try:
+        for i in range(len(pdf)):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            yield textpage.get_text_range()
+            textpage.close()
+            page.close()
+    finally:
+        pdf.close()
+
 
 def extract_text_from_pdf(pdf_path):
-    text = ""
+    # Accepts a file path or a seekable binary stream
+    parts = []
     try:
-        with open(pdf_path, "rb") as file:
-            reader = PdfReader(file)
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
+        for page_text in _pdf_page_texts(pdf_path):
+            if page_text:
+                parts.append(page_text + "\n")
     except Exception as e:
         print(f"Error processing PDF: {e}")
-    return text
+    return "".join(parts)
+
+
+def extract_text_from_pdfs(pdf_paths, max_workers=None):
+    """
+    Extract text from several PDF files in parallel, one worker process per
+    file. Returns texts in the same order as `pdf_paths`.
+    """
+    pdf_paths = list(pdf_paths)
+    if len(pdf_paths) <= 1:
+        return [extract_text_from_pdf(p) for p in pdf_paths]
+    workers = min(max_workers or os.cpu_count() or 1, len(pdf_paths))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(extract_text_from_pdf, pdf_paths))
 
 
 def extract_text_from_docx(docx_path):
-    text = ""
+    parts = []
     try:
         doc = Document(docx_path)
         for para in doc.paragraphs:
             if para.text is not None:
-                text += para.text + "\n"
+                parts.append(para.text + "\n")
     except Exception as e:
         print(f"Error processing DOCX: {e}")
-    return text
+    return "".join(parts)
 
 
 def normalize_display(text: str) -> str:
@@ -40,8 +87,8 @@ def normalize_display(text: str) -> str:
     text = text.replace("\r\n", "\n").replace("\r", "\n")
     text = text.replace("\u00a0", " ")  # non‑breaking space
     # collapse spaces/tabs but keep newlines
-    text = re.sub(r"[ \t]+", " ", text)
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = _SPACES_TABS.sub(" ", text)
+    text = _BLANK_LINES.sub("\n\n", text)
     return text.strip()
 
 
@@ -52,30 +99,38 @@ def clean_for_model(text: str) -> str:
     """
     if not isinstance(text, str):
         return ""
-    text = re.sub(r"http\S+|www\S+|https\S+", " ", text)
-    text = re.sub(r"[^\w\s]", " ", text)  # drop punctuation for model
-    text = text.lower()
-    # Keep numbers for ATS? For semantic matching we can drop them:
-    text = re.sub(r"\d+", " ", text)
-    text = re.sub(r"\s+", " ", text).strip()
+    # Drop URLs, punctuation and (for semantic matching) numbers
+    text = _MODEL_NOISE.sub(" ", text).lower()
+    text = _WHITESPACE.sub(" ", text).strip()
     return text
 
 
-def process_resume(file_path):
-    # Returns display-safe text (unstripped), not cleaned
-    if file_path.endswith(".pdf"):
-        text = extract_text_from_pdf(file_path)
-    elif file_path.endswith(".docx"):
-        text = extract_text_from_docx(file_path)
+def _read_bytes(source):
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return f.read()
+    return source.read()
+
+
+def process_resume(source, filename=None):
+    """
+    Return display-safe text (unstripped), not cleaned.
+    `source` is a file path or a binary stream such as an upload's `.stream`;
+    pass `filename` with a stream so the file type can be detected.
+    """
+    name = (filename if filename is not None else source).lower()
+    if name.endswith(".pdf"):
+        text = extract_text_from_pdf(source)
+    elif name.endswith(".docx"):
+        text = extract_text_from_docx(source)
     else:
+        data = _read_bytes(source)
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                text = f.read()
-        except:
-            with open(file_path, "r", encoding="latin-1") as f:
-                text = f.read()
+            text = data.decode("utf-8")
+        except UnicodeDecodeError:
+            text = data.decode("latin-1")
     return normalize_display(text)
 
 
-def process_jd(file_path):
-    return process_resume(file_path)
+def process_jd(source, filename=None):
+    return process_resume(source, filename)
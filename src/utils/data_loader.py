@@ -16,15 +16,20 @@ nltk.download("stopwords", quiet=True)
 nltk.download("punkt", quiet=True)
 stop_words = set(stopwords.words("english"))
 
+# URLs and punctuation go in one pass; digits are stripped after lowercasing
+# as before, since deleting them first can change how lower() treats the
+# letters that end up adjacent (Greek final sigma)
+_TEXT_NOISE = re.compile(r"http\S+|www\S+|[^\w\s]")
+_DIGITS = re.compile(r"\d+")
+_WHITESPACE = re.compile(r"\s+")
+
 
 def clean_text(text):
     if not isinstance(text, str):
         return ""
-    text = re.sub(r"http\S+|www\S+|https\S+", "", text, flags=re.MULTILINE)
-    text = re.sub(r"[^\w\s]", "", text)
-    text = text.lower()
-    text = re.sub(r"\d+", "", text)
-    text = re.sub(r"\s+", " ", text).strip()
+    text = _TEXT_NOISE.sub("", text).lower()
+    text = _DIGITS.sub("", text)
+    text = _WHITESPACE.sub(" ", text).strip()
     return text
 
 
@@ -34,6 +39,12 @@ def extract_skills(text):
     return list(set(tokens))
 
 
+def _skills_from_clean(text):
+    # clean_text output is lowercase words separated by single spaces, so a
+    # plain split replaces the NLTK tokenizer
+    return {word for word in text.split() if word not in stop_words and len(word) > 2}
+
+
 def load_all_datasets():
     job_taxonomy = []
     skills_db = set()
@@ -52,16 +63,16 @@ def load_all_datasets():
 
                 # Extract job titles and descriptions
                 if "job_title" in df.columns and "job_description" in df.columns:
-                    for _, row in df.iterrows():
-                        job_taxonomy.append(
-                            f"{row['job_title']} - {clean_text(row['job_description'])}"
-                        )
-                        skills_db.update(extract_skills(row["job_description"]))
+                    # Clean each description once for both taxonomy and skills
+                    titles = df["job_title"].astype(str)
+                    descs = df["job_description"].map(clean_text)
+                    job_taxonomy.extend((titles + " - " + descs).tolist())
+                    skills_db.update(*descs.map(_skills_from_clean))
 
                 # Extract skills from resume datasets
                 if "resume" in df.columns:
                     for resume in df["resume"]:
-                        skills_db.update(extract_skills(clean_text(resume)))
+                        skills_db.update(_skills_from_clean(clean_text(resume)))
 
                 logger.info(f"Loaded {len(df)} records from {ds_name}")
             except Exception as e:
@@ -95,10 +106,9 @@ def load_all_datasets():
 
                     # Process job titles and descriptions
                     if title_col and desc_col:
-                        for _, row in df.iterrows():
-                            job_taxonomy.append(
-                                f"{row[title_col]} - {clean_text(str(row[desc_col]))}"
-                            )
+                        titles = df[title_col].astype(str)
+                        descs = df[desc_col].astype(str).map(clean_text)
+                        job_taxonomy.extend((titles + " - " + descs).tolist())
 
                     # Process skills
                     if skills_col:
@@ -112,9 +122,10 @@ def load_all_datasets():
                 except Exception as e:
                     logger.error(f"Error loading Kaggle dataset {file}: {e}")
 
-    # Deduplicate and save
-    job_taxonomy = list(set(job_taxonomy))
-    skills_db = list(skills_db)
+    # Deduplicate (keeping first-seen order) and save; sorted skills keep the
+    # persisted artifact identical across runs
+    job_taxonomy = list(dict.fromkeys(job_taxonomy))
+    skills_db = sorted(skills_db)
 
     # Save skills database
     joblib.dump(skills_db, SKILLS_DB_PATH)
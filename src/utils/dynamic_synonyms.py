@@ -1,33 +1,50 @@
 import os
 import re
-import json
+import hashlib
+import threading
 import joblib
-from typing import Dict, List, Iterable
+from collections import OrderedDict
+from typing import Dict, List, Iterable, Optional, Tuple
 from ..core.config import SKILLS_DB_PATH
 from ..analysis.gemini_model_manager import gemini_manager
+from ..analysis.gemini_analysis import extract_json
 from functools import lru_cache
 
+SYNONYM_CACHE_SIZE = 256
+
+@lru_cache(maxsize=1)
+def _load_skills_db() -> Tuple[str, ...]:
+    """Read the skills DB from disk once per process"""
+    if os.path.exists(SKILLS_DB_PATH):
+        try:
+            data = joblib.load(SKILLS_DB_PATH)
+            return tuple(str(x).strip() for x in (data or []) if str(x).strip())
+        except Exception:
+            return ()
+    return ()
+
 class DynamicSynonyms:
     def __init__(self):
-        self.skills_db = self._load_skills_db()
-        self.synonym_cache = {}
-    
-    @lru_cache(maxsize=1000)
-    def _load_skills_db(self) -> List[str]:
-        if os.path.exists(SKILLS_DB_PATH):
-            try:
-                data = joblib.load(SKILLS_DB_PATH)
-                return [str(x).strip() for x in (data or []) if str(x).strip()]
-            except Exception:
-                return []
-        return []
+        self.skills_db = _load_skills_db()
+        # Bounded LRU; the engine is shared by every request thread
+        self.synonym_cache: "OrderedDict[tuple, Dict[str, List[str]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Skills grouped by normalized key, so lookups are one dict probe
+        self._skills_by_norm: Dict[str, List[str]] = {}
+        for skill in self.skills_db:
+            self._skills_by_norm.setdefault(self._normalize_key(skill), []).append(skill.lower())
     
-    def _ai_synonyms_for_terms(terms: Iterable[str], jd_text: str) -> Dict[str, List[str]]:
-        """Ask Gemini for role-aware aliases using latest model"""
+    @staticmethod
+    def _ai_synonyms_for_terms(terms: Iterable[str], jd_text: str) -> Optional[Dict[str, List[str]]]:
+        """Ask Gemini for role-aware aliases using latest model.
+
+        Returns None when the model is unavailable or the call/parse failed,
+        so callers can tell a failure apart from "no aliases".
+        """
         
         model = gemini_manager.get_model()
         if not model:
-            return {}
+            return None
 
         terms_list = [str(t).strip().lower() for t in (terms or []) if str(t).strip()]
         if not terms_list:
@@ -46,7 +63,9 @@ class DynamicSynonyms:
         """
         try:
             resp = model.generate_content(prompt)
-            data = _safe_json(resp.text or "")
+            data = extract_json(resp.text or "")
+            if data is None:
+                return None
             
             # Sanitize response
             out: Dict[str, List[str]] = {}
@@ -59,7 +78,7 @@ class DynamicSynonyms:
                     for it in v:
                         if isinstance(it, str):
                             s = it.strip().lower()
-                           if s and s != key and s not in arr:
+                            if s and s != key and s not in arr:
                                 arr.append(s)
                 out[key] = arr[:6]
             
@@ -69,7 +88,7 @@ class DynamicSynonyms:
             return out
         except Exception as e:
             print(f"❌ Synonym generation failed: {str(e)}")
-            return {}
+            return None
     
     def _normalize_key(self, s: str) -> str:
         """Normalize for comparison"""
@@ -112,9 +131,9 @@ class DynamicSynonyms:
         
         # Add database variants
         normalized = self._normalize_key(term)
-        for skill in self.skills_db:
-            if self._normalize_key(skill) == normalized and skill.lower() != term:
-                synonyms.add(skill.lower())
+        for alt in self._skills_by_norm.get(normalized, ()):
+            if alt != term:
+                synonyms.add(alt)
         
         return list(synonyms)
     
@@ -127,78 +146,53 @@ class DynamicSynonyms:
         jd_text: str
     ) -> Dict[str, List[str]]:
         """Get comprehensive synonyms with caching"""
-        cache_key = hash(f"{','.join(req_terms)}{','.join(opt_terms)}{jd_text[:100]}")
+        buckets = tuple(
+            tuple(str(t).strip().lower() for t in (bucket or []) if str(t).strip())
+            for bucket in (req_terms, opt_terms, tech_terms, soft_terms)
+        )
+        jd_digest = hashlib.sha256((jd_text or "").encode("utf-8")).hexdigest()
+        cache_key = (buckets, jd_digest)
         
-        if cache_key in self.synonym_cache:
-            return self.synonym_cache[cache_key]
+        with self._cache_lock:
+            cached = self.synonym_cache.get(cache_key)
+            if cached is not None:
+                self.synonym_cache.move_to_end(cache_key)
+                return {k: list(v) for k, v in cached.items()}
         
-        all_terms = []
-        for bucket in (req_terms, opt_terms, tech_terms, soft_terms):
-            all_terms.extend([str(t).strip().lower() for t in (bucket or []) if str(t).strip()])
+        all_terms = [t for bucket in buckets for t in bucket]
         
         # Get unique terms
         unique_terms = list(dict.fromkeys(all_terms))
         
+        # One batched Gemini call covers every term (None when it failed)
+        ai_synonyms = self._ai_synonyms_for_terms(unique_terms, jd_text)
+        ai_failed = ai_synonyms is None
+        if ai_failed:
+            ai_synonyms = {}
+        
         synonyms = {}
         for term in unique_terms:
             # Start with deterministic synonyms
             term_synonyms = self.get_deterministic_synonyms(term)
             
-            # Add AI synonyms if available (with fallback)
-            ai_synonyms = self._get_cached_ai_synonyms(term, jd_text)
-            term_synonyms.extend(ai_synonyms)
+            # Add AI synonyms if available
+            term_synonyms.extend(ai_synonyms.get(term, []))
             
             # Remove duplicates and limit
             synonyms[term] = list(dict.fromkeys(term_synonyms))[:8]
         
-        self.synonym_cache[cache_key] = synonyms
-        return synonyms
-    
-    def _get_cached_ai_synonyms(self, term: str, jd_text: str) -> List[str]:
-        """Get AI synonyms with caching and fallback"""
-        try:
-            api_key = os.getenv("GEMINI_API_KEY")
-            if not api_key:
-                return []
-            
-            genai.configure(api_key=api_key)
-            # With this:
-            def get_working_model():
-                model_names = ["gemini-1.5-flash", "gemini-1.0-pro", "gemini-pro"]
-    
-                for model_name in model_names:
-                    try:
-                        return genai.GenerativeModel(
-                            model_name,
-                            generation_config={"temperature": 0.0, "top_p": 1.0, "top_k": 1}
-                        )
-                    except Exception:
-                        continue
-                raise Exception("No working Gemini model found")
-
-            model = get_working_model()
-            
-            prompt = f"""
-Return only a JSON array of 3-5 lowercase synonyms/abbreviations for "{term}" in this job context.
-No definitions, no explanations, just the array.
+        # Don't pin a deterministic-only fallback; retry Gemini next time
+        if not ai_failed:
+            with self._cache_lock:
+                self.synonym_cache[cache_key] = synonyms
+                self.synonym_cache.move_to_end(cache_key)
+                while len(self.synonym_cache) > SYNONYM_CACHE_SIZE:
+                    self.synonym_cache.popitem(last=False)
+        return {k: list(v) for k, v in synonyms.items()}
 
-Context: {jd_text[:300]}
-
-Example format: ["synonym1", "synonym2", "synonym3"]
-"""
-            
-            response = model.generate_content(prompt)
-            result = json.loads(response.text.strip())
-            
-            if isinstance(result, list):
-                return [str(s).lower().strip() for s in result[:5] if isinstance(s, str)]
-            
-        except Exception:
-            pass
-        
-        return []
+# Shared engine so the skills DB and synonym cache survive between calls
+_ENGINE = DynamicSynonyms()
 
 # Update the original function to use the class
 def get_role_synonyms(req_terms, opt_terms, tech_terms, soft_terms, jd_text):
-    synonym_engine = DynamicSynonyms()
-    return synonym_engine.get_role_synonyms(req_terms, opt_terms, tech_terms, soft_terms, jd_text)
+    return _ENGINE.get_role_synonyms(req_terms, opt_terms, tech_terms, soft_terms, jd_text)
@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 from typing import Dict, Iterable, List, Set, Tuple
 
 # Flexible separator between tokens inside a term (space, -, _, /, .)
@@ -30,7 +31,23 @@ SYNONYMS: Dict[str, List[str]] = {
 }
 
 def canonical(term: str) -> str:
-    return (term or "").strip().lower()
+    # Final sigma folds to plain sigma, as in fold_case
+    return (term or "").strip().lower().replace("ς", "σ")
+
+def fold_case(text: str) -> str:
+    """
+    Lowercase text once so patterns can run without (?i). Every character
+    keeps its offset, so spans found in the folded copy index the original.
+    str.lower() turns a word-final 'Σ' into 'ς', so both sigmas fold to 'σ'
+    to keep the comparison context-free like re's IGNORECASE.
+    """
+    text = text or ""
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # 'İ' expands when lowercased; keep its first code point, which is the
+        # simple lowercase mapping that re's IGNORECASE uses as well
+        lowered = "".join(c.lower()[0] for c in text)
+    return lowered.replace("ς", "σ")
 
 def _token_sep_variant(t: str) -> str:
     # Convert "power bi" -> r'power[\s\-/_.]*bi'
@@ -41,7 +58,10 @@ def term_variants(term: str) -> List[str]:
     """
     Return canonical term + known synonyms/aliases + flexible-separator variants
     """
-    t = canonical(term)
+    return list(_variants(canonical(term)))
+
+@lru_cache(maxsize=4096)
+def _variants(t: str) -> Tuple[str, ...]:
     variants = [t]
     variants.extend(SYNONYMS.get(t, []))
     # Flexible variant for multi-token terms
@@ -57,54 +77,215 @@ def term_variants(term: str) -> List[str]:
         if v2 not in seen:
             seen.add(v2)
             out.append(v)
-    return out
+    return tuple(out)
 
-def compile_patterns_for_term(term: str) -> List[re.Pattern]:
+def compile_patterns_for_term(term: str) -> Tuple[re.Pattern, ...]:
     """
     Build patterns for term and its variants.
     (?<!\w) and (?!\w) let punctuation tokens like 'c++' match.
+    Variants are lowercase and patterns are case-sensitive: run them on
+    fold_case(text). Cached per canonical term for the process lifetime.
     """
+    return _compile_patterns(canonical(term))
+
+@lru_cache(maxsize=4096)
+def _compile_patterns(t: str) -> Tuple[re.Pattern, ...]:
     patterns: List[re.Pattern] = []
-    for v in term_variants(term):
+    for v in _variants(t):
         # If already looks like a pattern (contains backslashes) leave as-is
         if '\\' in v and ('\\s' in v or '\\-' in v or '\\.' in v):
-            pat = r'(?i)(?<!\w)' + v + r'(?!\w)'
+            pat = r'(?<!\w)' + v + r'(?!\w)'
         else:
-            pat = r'(?i)(?<!\w)' + re.escape(v) + r'(?!\w)'
+            pat = r'(?<!\w)' + re.escape(v) + r'(?!\w)'
         patterns.append(re.compile(pat))
-    return patterns
+    return tuple(patterns)
 
-def any_match_with_surface(text: str, patterns: Iterable[re.Pattern]) -> str:
+def any_match_with_surface(text: str, patterns: Iterable[re.Pattern], folded: str = None) -> str:
     """
-    Return the first matched surface string or "" if none.
+    Return the first matched surface string (original casing) or "" if none.
     (?<!\\w) and (?!\\w) let punctuation tokens like 'c++' match.
+    Pass `folded` (fold_case(text)) to reuse one lowercased copy across calls.
     """
+    if folded is None:
+        folded = fold_case(text)
     for p in patterns:
-        m = p.search(text)
+        m = p.search(folded)
         if m:
-            return m.group(0)
+            return text[m.start():m.end()]
     return ""
 
+_REGEX_META = set('[](){}.*+?|^$')
+
+def _literal_prefix(pattern: str) -> str:
+    """
+    Literal text every match of a compiled term pattern starts with, e.g.
+    'power' for the flexible-separator form of 'power bi'. Empty when the
+    variant begins with a separator class (e.g. the flexible forms of '.net').
+    """
+    body = pattern[len(r'(?<!\w)'):]
+    out = []
+    i = 0
+    while i < len(body):
+        c = body[i]
+        if c == '\\':
+            nxt = body[i + 1:i + 2]
+            if not nxt or nxt.isalnum():
+                break
+            out.append(nxt)
+            i += 2
+        elif c in _REGEX_META:
+            break
+        else:
+            out.append(c)
+            i += 1
+    return ''.join(out)
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """
+    Build a prefix-trie alternation from literal words, e.g. java|javascript ->
+    java(?:script)?, so the engine follows one trie path per position instead
+    of trying every alternative. Greedy optionals keep longest-match-first.
+    """
+    trie: Dict[str, dict] = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def emit(node):
+        branches = [re.escape(ch) + emit(child) for ch, child in node.items() if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return '(?:' + body + ')?' if '' in node else body
+
+    return emit(trie)
+
+_WORD = re.compile(r'\w+')
+
+def _is_plain_word(t: str) -> bool:
+    """Term made only of word characters, with no synonyms or separator forms"""
+    return _WORD.fullmatch(t) is not None and _variants(t) == (t,)
+
+def _find_word(folded: str, word: str) -> int:
+    """
+    str.find with the same word-boundary guards as the term patterns: the
+    characters around a hit must not be word characters (alnum or '_').
+    """
+    n = len(word)
+    i = folded.find(word)
+    while i != -1:
+        before = folded[i - 1] if i else ' '
+        after = folded[i + n] if i + n < len(folded) else ' '
+        if not (before.isalnum() or before == '_' or after.isalnum() or after == '_'):
+            return i
+        i = folded.find(word, i + 1)
+    return -1
+
+@lru_cache(maxsize=64)
+def _combined_scanner(terms: Tuple[str, ...]):
+    """
+    Index every variant pattern of every term by its literal prefix. Returns
+    (candidates, alts, by_first, anywhere): candidates is one regex whose
+    single finditer pass yields each position where some prefix starts,
+    alts[k] = (term, pattern, prefix) in term/variant order, by_first maps a
+    prefix's first character to alt indices and anywhere holds alts with no
+    literal prefix, which are searched on their own.
+    """
+    alts: List[Tuple[str, re.Pattern, str]] = []
+    by_first: Dict[str, List[int]] = {}
+    anywhere: List[int] = []
+    for t in terms:
+        for p in _compile_patterns(t):
+            k = len(alts)
+            prefix = _literal_prefix(p.pattern)
+            alts.append((t, p, prefix))
+            if prefix:
+                by_first.setdefault(prefix[0], []).append(k)
+            else:
+                anywhere.append(k)
+    prefixes = {prefix for _, _, prefix in alts if prefix}
+    candidates = None
+    if prefixes:
+        # Zero-width, so overlapping starts (node.js / js) are all visited
+        candidates = re.compile(r'(?<!\w)(?=' + trie_pattern(prefixes) + ')')
+    return candidates, alts, by_first, anywhere
+
+def _scan_surfaces(text: str, folded: str, terms: Tuple[str, ...]) -> Dict[str, str]:
+    """
+    Map each canonical term to its matched surface ("" if absent), with the
+    same result as searching its patterns one by one but a single pass over
+    the text for everything that has a literal prefix.
+    """
+    if not terms:
+        return {}
+    surfaces = dict.fromkeys(terms, "")
+    # Plain words need no regex: a C-level substring search plus a check of
+    # the characters on either side gives the same first match
+    rest = []
+    for t in terms:
+        if _is_plain_word(t):
+            i = _find_word(folded, t)
+            if i != -1:
+                surfaces[t] = text[i:i + len(t)]
+        else:
+            rest.append(t)
+    candidates, alts, by_first, anywhere = _combined_scanner(tuple(rest))
+    spans: Dict[int, Tuple[int, int]] = {}
+    if candidates is not None:
+        for m in candidates.finditer(folded):
+            pos = m.start()
+            for k in by_first[folded[pos]]:
+                if k in spans or not folded.startswith(alts[k][2], pos):
+                    continue
+                hit = alts[k][1].match(folded, pos)
+                if hit:
+                    spans[k] = hit.span()
+    for k in anywhere:
+        hit = alts[k][1].search(folded)
+        if hit:
+            spans[k] = hit.span()
+    # Variant order decides the surface, as in any_match_with_surface
+    for k, (t, _, _) in enumerate(alts):
+        if k in spans and not surfaces[t]:
+            s, e = spans[k]
+            surfaces[t] = text[s:e]
+    return surfaces
+
+def present_missing_multi(text: str, groups: Dict[str, Iterable[str]], synonyms: Dict = None) -> Dict[str, Tuple[Set[str], Set[str], Dict[str, str]]]:
+    """
+    Batched present/missing check for several term groups against one text.
+    All distinct canonical terms are matched in a single scan of the text,
+    and the result is bucketed back per group:
+    {group: (present set, missing set, surfaces dict term->matched surface)}.
+    """
+    text = text or ""
+    canon = {name: [canonical(raw) for raw in terms or []] for name, terms in groups.items()}
+    unique = tuple(sorted({t for ts in canon.values() for t in ts if t}))
+    matched = _scan_surfaces(text, fold_case(text), unique)
+    out: Dict[str, Tuple[Set[str], Set[str], Dict[str, str]]] = {}
+    for name, terms in canon.items():
+        present: Set[str] = set()
+        missing: Set[str] = set()
+        surfaces: Dict[str, str] = {}
+        for t in terms:
+            if not t:
+                continue
+            surface = matched[t]
+            if surface:
+                present.add(t)
+                surfaces[t] = surface
+            else:
+                missing.add(t)
+        out[name] = (present, missing, surfaces)
+    return out
+
 def present_missing_with_surface(text: str, terms: Iterable[str], synonyms: Dict = None) -> Tuple[Set[str], Set[str], Dict[str, str]]:
     """
     Return (present set, missing set, surfaces dict term->matched surface).
     """
-    text = text or ""
-    present: Set[str] = set()
-    missing: Set[str] = set()
-    surfaces: Dict[str, str] = {}
-    for raw in terms or []:
-        t = canonical(raw)
-        if not t:
-            continue
-        patterns = compile_patterns_for_term(t)
-        surface = any_match_with_surface(text, patterns)
-        if surface:
-            present.add(t)
-            surfaces[t] = surface
-        else:
-            missing.add(t)
-    return present, missing, surfaces
+    return present_missing_multi(text, {"terms": terms}, synonyms)["terms"]
 
 # Backward-compatible wrapper if needed elsewhere
 def present_missing(text: str, terms: Iterable[str]) -> Tuple[Set[str], Set[str]]: